@@ -1,8 +1,54 @@
 import streamlit as st
 import re
 import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Tuple
 
+# Pre-compiled patterns used for text analysis
+_SENT_RE = re.compile(r'[.!?]+')
+_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Common words ignored when extracting key terms
+_COMMON = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
+    'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him',
+    'her', 'us', 'them', 'my', 'your', 'his', 'its', 'our', 'their'
+})
+
+# Labels for multiple choice options
+_LETTERS = "ABCD"
+
+def _extract_key_terms(text: str) -> List[str]:
+    """Extract key terms from the text using simple heuristics."""
+    # Count word frequency, skipping common words
+    word_freq = Counter(
+        word for word in _WORD_RE.findall(text.lower()) if word not in _COMMON
+    )
+    
+    # Most frequent terms first; ties keep the order they appear in the text
+    return [word for word, _ in word_freq.most_common(15)]
+
+def _extract_sentences(text: str) -> List[str]:
+    """Extract meaningful sentences from the text."""
+    meaningful_sentences = []
+    
+    for sentence in _SENT_RE.split(text):
+        sentence = sentence.strip()
+        # Filter out very short sentences
+        if len(sentence.split(maxsplit=4)) >= 5:
+            meaningful_sentences.append(sentence)
+    
+    return meaningful_sentences
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _analyze_text(text: str) -> Tuple[List[str], List[str]]:
+    """Extract key terms and sentences, cached across sessions."""
+    return _extract_key_terms(text), _extract_sentences(text)
+
 class QuizGenerator:
     def __init__(self):
         self.question_starters = [
@@ -26,50 +72,13 @@ class QuizGenerator:
     
     def extract_key_terms(self, text: str) -> List[str]:
         """Extract key terms from the text using simple heuristics."""
-        # Remove common words and extract meaningful terms
-        common_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these',
-            'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him',
-            'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
-        }
-        
-        # Split into sentences and words
-        sentences = re.split(r'[.!?]+', text)
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        
-        # Count word frequency
-        word_freq = {}
-        for word in words:
-            if word not in common_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # Get most frequent terms (at least 2 occurrences)
-        key_terms = [word for word, freq in word_freq.items() if freq >= 2]
-        
-        # If not enough frequent terms, add some single occurrence terms
-        if len(key_terms) < 10:
-            single_terms = [word for word, freq in word_freq.items() if freq == 1]
-            key_terms.extend(single_terms[:10-len(key_terms)])
-        
-        return key_terms[:15]  # Return top 15 terms
+        return _extract_key_terms(text)
     
     def extract_sentences(self, text: str) -> List[str]:
         """Extract meaningful sentences from the text."""
-        sentences = re.split(r'[.!?]+', text)
-        meaningful_sentences = []
-        
-        for sentence in sentences:
-            sentence = sentence.strip()
-            # Filter out very short sentences
-            if len(sentence.split()) >= 5:
-                meaningful_sentences.append(sentence)
-        
-        return meaningful_sentences
+        return _extract_sentences(text)
     
-    def generate_essay_questions(self, text: str, key_terms: List[str]) -> List[str]:
+    def generate_essay_questions(self, key_terms: List[str]) -> List[str]:
         """Generate essay assignment questions."""
         essay_questions = []
         
@@ -88,15 +97,20 @@ class QuizGenerator:
         
         return essay_questions
     
-    def generate_multiple_choice(self, text: str, key_terms: List[str], sentences: List[str]) -> List[Dict]:
+    def generate_multiple_choice(self, key_terms: List[str], sentences: List[str]) -> List[Dict]:
         """Generate multiple choice questions."""
         mc_questions = []
         
+        # Draw the distractor terms for all questions up front (3 per question)
+        distractor_terms = random.choices(key_terms, k=3 * 3) if key_terms else []
+        
+        # Only questions with both a key term and a sentence get specific content
+        num_specific = min(len(key_terms), len(sentences))
+        
         # Generate questions based on key terms and sentences
         for i in range(3):  # Generate 3 questions
-            if i < len(key_terms) and i < len(sentences):
+            if i < num_specific:
                 term = key_terms[i]
-                context_sentence = sentences[i] if i < len(sentences) else sentences[0]
                 
                 question_starter = random.choice(self.question_starters)
                 question = f"{question_starter} {term}?"
@@ -105,21 +119,22 @@ class QuizGenerator:
                 # you might use NLP libraries for better option generation)
                 correct_answer = f"Related to {term} as mentioned in the context"
                 
+                term_a, term_b, term_c = distractor_terms[3*i:3*i+3]
                 options = [
-                    correct_answer,
-                    f"Unrelated concept A about {random.choice(key_terms) if key_terms else 'general topic'}",
-                    f"Unrelated concept B about {random.choice(key_terms) if key_terms else 'another topic'}",
-                    f"Unrelated concept C about {random.choice(key_terms) if key_terms else 'different subject'}"
+                    f"Unrelated concept A about {term_a}",
+                    f"Unrelated concept B about {term_b}",
+                    f"Unrelated concept C about {term_c}"
                 ]
                 
-                # Shuffle options
+                # Shuffle distractors, then place the correct answer at a random slot
                 random.shuffle(options)
-                correct_index = options.index(correct_answer)
+                correct_index = random.randrange(4)
+                options.insert(correct_index, correct_answer)
                 
                 mc_questions.append({
                     'question': question,
                     'options': options,
-                    'correct_answer': chr(65 + correct_index),  # A, B, C, or D
+                    'correct_answer': _LETTERS[correct_index],
                     'explanation': f"This question focuses on understanding {term} in the given context."
                 })
             else:
@@ -143,19 +158,23 @@ class QuizGenerator:
     
     def generate_content(self, input_text: str) -> Tuple[List[str], List[Dict]]:
         """Main method to generate all content."""
-        if not input_text.strip():
+        if not input_text or input_text.isspace():
             return [], []
         
-        # Extract key information from text
-        key_terms = self.extract_key_terms(input_text)
-        sentences = self.extract_sentences(input_text)
+        # Extract key information from text, reusing earlier results for the same text
+        key_terms, sentences = _analyze_text(input_text)
         
         # Generate content
-        essay_questions = self.generate_essay_questions(input_text, key_terms)
-        mc_questions = self.generate_multiple_choice(input_text, key_terms, sentences)
+        essay_questions = self.generate_essay_questions(key_terms)
+        mc_questions = self.generate_multiple_choice(key_terms, sentences)
         
         return essay_questions, mc_questions
 
+@st.cache_resource
+def _get_executor() -> ThreadPoolExecutor:
+    """Shared worker used to analyse uploaded files before generation is requested."""
+    return ThreadPoolExecutor(max_workers=1)
+
 def main():
     st.set_page_config(
         page_title="Assignment & Quiz Generator",
@@ -210,7 +229,14 @@ def main():
         )
         
         if uploaded_file is not None:
-            input_text = str(uploaded_file.read(), "utf-8")
+            input_text = uploaded_file.getvalue().decode("utf-8", errors="replace")
+            
+            # Start analysing the file in the background while the user reviews it;
+            # generate_content later picks the result up from the _analyze_text cache
+            if st.session_state.get('prefetch_file_id') != uploaded_file.file_id:
+                st.session_state.prefetch_file_id = uploaded_file.file_id
+                _get_executor().submit(_analyze_text, input_text)
+            
             st.text_area("File content preview:", value=input_text[:500] + "..." if len(input_text) > 500 else input_text, height=150, disabled=True)
     
     # Generate button
@@ -219,7 +245,7 @@ def main():
         generate_clicked = st.button("🔄 Generate Questions", type="primary", use_container_width=True)
     
     # Generate and display results
-    if generate_clicked and input_text.strip():
+    if generate_clicked and input_text and not input_text.isspace():
         with st.spinner("Generating questions..."):
             essay_questions, mc_questions = st.session_state.generator.generate_content(input_text)
         
@@ -248,8 +274,7 @@ def main():
                         st.subheader(f"Question {i}")
                         st.write(q['question'])
                         
-                        for j, option in enumerate(q['options']):
-                            prefix = chr(65 + j)  # A, B, C, D
+                        for prefix, option in zip(_LETTERS, q['options']):
                             if prefix == q['correct_answer']:
                                 st.write(f"**{prefix}. {option}** ✓")
                             else:
@@ -268,21 +293,21 @@ def main():
             st.header("📤 Export Results")
             
             # Prepare export text
-            export_text = "ASSIGNMENT & QUIZ GENERATOR RESULTS\n" + "="*50 + "\n\n"
+            export_parts = ["ASSIGNMENT & QUIZ GENERATOR RESULTS\n", "="*50, "\n\n"]
             
-            export_text += "ASSIGNMENT QUESTIONS:\n" + "-"*25 + "\n"
+            export_parts += ["ASSIGNMENT QUESTIONS:\n", "-"*25, "\n"]
             for i, question in enumerate(essay_questions, 1):
-                export_text += f"\n{i}. {question.replace(f'Essay Question {i}: ', '')}\n"
+                export_parts.append(f"\n{i}. {question.replace(f'Essay Question {i}: ', '')}\n")
             
-            export_text += "\n\nQUIZ QUESTIONS:\n" + "-"*20 + "\n"
+            export_parts += ["\n\nQUIZ QUESTIONS:\n", "-"*20, "\n"]
             for i, q in enumerate(mc_questions, 1):
-                export_text += f"\n{i}. {q['question']}\n"
-                for j, option in enumerate(q['options']):
-                    prefix = chr(65 + j)
-                    export_text += f"   {prefix}. {option}\n"
-                export_text += f"   Correct Answer: {q['correct_answer']}\n"
+                export_parts.append(f"\n{i}. {q['question']}\n")
+                for prefix, option in zip(_LETTERS, q['options']):
+                    export_parts.append(f"   {prefix}. {option}\n")
+                export_parts.append(f"   Correct Answer: {q['correct_answer']}\n")
                 if show_explanations:
-                    export_text += f"   Explanation: {q['explanation']}\n"
+                    export_parts.append(f"   Explanation: {q['explanation']}\n")
+            export_text = "".join(export_parts)
             
             # Download button
             st.download_button(